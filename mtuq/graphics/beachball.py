@@ -13,7 +13,10 @@ import matplotlib.pyplot as pyplot
 import numpy as np
 import subprocess
 
+from functools import lru_cache
 from glob import glob
+from os.path import join
+from tempfile import TemporaryDirectory
 from mtuq.event import MomentTensor
 from mtuq.graphics._gmt import _parse_filetype, _get_format_arg, _safename,\
     exists_gmt, gmt_major_version
@@ -32,7 +35,8 @@ def plot_beachball(filename, mt, stations, origin, **kwargs):
     .. rubric :: Required arguments
 
     ``filename`` (`str`):
-    Name of output image file
+    Name of output image file, or `None` to return the image as an RGBA
+    NumPy array rather than writing it to disk
 
     ``mt`` (`mtuq.MomentTensor`):
     Moment tensor object
@@ -67,6 +71,9 @@ def plot_beachball(filename, mt, stations, origin, **kwargs):
     if type(mt)!=MomentTensor:
         raise TypeError
 
+    if filename is None:
+        return _plot_beachball_array(mt, stations, origin, **kwargs)
+
     if exists_pygmt():
         _plot_beachball_pygmt(filename, mt, stations, origin, **kwargs)
         return
@@ -76,16 +83,73 @@ def plot_beachball(filename, mt, stations, origin, **kwargs):
         return
 
     try:
-          warn("plot_beachball: Falling back to ObsPy")
-          from matplotlib import pyplot
-          obspy.imaging.beachball.beachball(
-              mt.as_vector(), size=200, linewidth=2, facecolor=fill_color)
-          pyplot.savefig(filename)
-          pyplot.close()
+        warn("plot_beachball: Falling back to ObsPy")
+        fig = _plot_beachball_obspy(mt, **kwargs)
+        fig.savefig(filename)
+        pyplot.close(fig)
     except:
         warn("plot_beachball: Plotting failed")
 
 
+def _plot_beachball_array(mt, stations, origin, **kwargs):
+    """ Renders beachball to an RGBA NumPy array
+    """
+    if _exists_gmt_backend():
+        # GMT can only write image files, so a temporary directory is the
+        # closest we can get to an in-memory render
+        with TemporaryDirectory() as dirname:
+            filename = join(dirname, 'beachball.png')
+            plot_beachball(filename, mt, stations, origin, **kwargs)
+            return pyplot.imread(filename)
+
+    try:
+        warn("plot_beachball: Falling back to ObsPy")
+        fig = _plot_beachball_obspy(mt, **kwargs)
+        fig.canvas.draw()
+        array = np.array(fig.canvas.buffer_rgba())
+        pyplot.close(fig)
+        return array
+    except:
+        warn("plot_beachball: Plotting failed")
+
+
+#
+# ObsPy implementation
+#
+
+def _plot_beachball_obspy(mt, fill_color='gray', **kwargs):
+    # unlike obspy.imaging.beachball.beachball, never calls pyplot.show
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(2., 2.), dpi=100)
+    FigureCanvasAgg(fig)
+    fig.subplots_adjust(left=0, bottom=0, right=1, top=1)
+
+    ax = fig.add_subplot(111, aspect='equal')
+    ax.axison = False
+    ax.add_collection(_beachball_collection(
+        mt, xy=(0, 0), width=190, linewidth=2, fill_color=fill_color))
+    ax.autoscale_view(tight=False, scalex=True, scaley=True)
+
+    return fig
+
+
+def _beachball_collection(mt, xy, width, linewidth=2, fill_color='gray'):
+    """ Returns beachball patches as a matplotlib collection, which can be
+    added directly to existing axes (`xy` and `width` in data coordinates)
+    """
+    return obspy.imaging.beachball.beach(
+        mt.as_vector(), xy=xy, width=width, size=200, linewidth=linewidth,
+        facecolor=fill_color)
+
+
+@lru_cache(maxsize=None)
+def _exists_gmt_backend():
+    # checked once per process, since the GMT check spawns a subprocess
+    return exists_pygmt() or (exists_gmt() and gmt_major_version() >= 6)
+
+
 def plot_polarities(filename, observed, predicted, stations, origin, mt, **kwargs):
     """ Plots first-motion polarities
 
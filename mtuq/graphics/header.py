@@ -6,10 +6,14 @@
 
 import numpy as np
 import os
+from functools import lru_cache
+from math import acos, degrees
+from weakref import WeakKeyDictionary
 from matplotlib import pyplot
 from matplotlib.font_manager import FontProperties
 from mtuq.event import MomentTensor
-from mtuq.graphics.beachball import plot_beachball
+from mtuq.graphics.beachball import plot_beachball, _beachball_collection,\
+    _exists_gmt_backend
 from mtuq.graphics._pygmt import exists_pygmt, plot_force
 from mtuq.util.math import to_delta_gamma
 
@@ -23,12 +27,17 @@ class Base(object):
 
     def _get_axis(self, height, fig=None):
         """ Returns matplotlib axes of given height along top of figure
-        """
-        if hasattr(self, '_axis'):
-            return self._axis
 
+        The axes are reused by subsequent calls on the same figure, and
+        recreated if the header is written to a different figure
+        """
         if fig is None:
             fig = pyplot.gcf()
+
+        if getattr(self, '_axis', None) is not None and\
+           self._axis.figure is fig:
+            return self._axis
+
         width, figure_height = fig.get_size_inches()
 
         assert height < figure_height, Exception(
@@ -75,8 +84,8 @@ class TextHeader(Base):
         self.items = items
 
 
-    def write(self, height, width, margin_left, margin_top):
-        ax = self._get_axis(height)
+    def write(self, height, width, margin_left, margin_top, fig=None):
+        ax = self._get_axis(height, fig=fig)
 
         for item in self.items:
             xp, yp, text = item[0], item[1], item[2]
@@ -121,21 +130,11 @@ class SourceHeader(Base):
         else:
             units = 's'
 
-        if self.process_bw and units=='Hz':
-            self.passband_bw = '%.1f - %.1f Hz' %\
-                (self.process_bw.freq_min, self.process_bw.freq_max)
-
-        elif self.process_bw and units=='s':
-            self.passband_bw = '%.1f - %.1f s' %\
-                (self.process_bw.freq_max**-1, self.process_bw.freq_min**-1)
-
-        if self.process_sw and units=='Hz':
-            self.passband_sw = '%.1f - %.1f Hz' %\
-                (self.process_sw.freq_min, self.process_sw.freq_max)
+        if self.process_bw:
+            self.passband_bw = _passband(self.process_bw)[units]
 
-        elif self.process_sw and units=='s':
-            self.passband_sw = '%.1f - %.1f s' %\
-                (self.process_sw.freq_max**-1, self.process_sw.freq_min**-1)
+        if self.process_sw:
+            self.passband_sw = _passband(self.process_sw)[units]
             
     def parse_station_counts(self):
         def get_station_info(data_list):
@@ -205,25 +204,11 @@ class MomentTensorHeader(SourceHeader):
         self.parse_data_processing()
         self.parse_station_counts()
 
+        # header text doesn't depend on figure, so it's only constructed once
+        self.lines = self._build_lines()
 
-    def display_source(self, ax, height, width, offset):
-
-        #
-        # If ObsPy plotted focal mechanisms correctly we could do the following
-        #
 
-        #from obspy.imaging.beachball import beach
-        ## beachball size
-        #diameter = 0.75*height
-        #xp = 0.50*diameter + offset
-        #yp = 0.45*height
-        #ax.add_collection(
-        #    beach(self.mt, xy=(xp, yp), width=diameter,
-        #    linewidth=0.5, facecolor='gray'))
-
-        #
-        # Instead, we must use this workaround
-        #
+    def display_source(self, ax, height, width, offset):
 
         # beachball size
         diameter = 0.75*height
@@ -232,22 +217,61 @@ class MomentTensorHeader(SourceHeader):
         xp = offset
         yp = 0.075*height
 
-        plot_beachball('tmp.png', self.mt, None, None)
-        img = pyplot.imread('tmp.png')
+        if not _exists_gmt_backend():
+            # without GMT, plot_beachball would fall back to ObsPy anyway, so
+            # we might as well draw the ObsPy patches directly on the header
+            # axes and skip the rasterization round trip
+            ax.add_collection(_beachball_collection(self.mt,
+                xy=(xp+0.5*diameter, yp+0.5*diameter), width=0.95*diameter,
+                linewidth=1))
+            return
 
-        try:
-            os.remove('tmp.png')
-            os.remove('tmp.ps')
-        except:
-            pass
+        # ObsPy doesn't always plot focal mechanisms correctly, so when GMT
+        # is available, we must use this workaround
+        img = _render_beachball(tuple(np.round(self.mt.as_vector(), 6)))
 
-        ax.imshow(img, extent=(xp,xp+diameter,yp,yp+diameter))
+        if img is not None:
+            ax.imshow(img, extent=(xp,xp+diameter,yp,yp+diameter))
+
+
+    def _build_lines(self):
+        """ Returns header text as a list of four lines
+        """
+        # text line #1
+        line1 = '%s  %s  $M_w$ %.2f  Depth %s' % (
+            self.event_name, _lat_lon(self.origin), self.magnitude, self.depth_str)
+
+        # text line #2
+        line2 = u'model: %s   solver: %s   misfit (%s): %.3e' % \
+                (self.model, self.solver, self.norm, self.best_misfit)
+
+        # text line #3
+        if self.process_bw and self.process_sw:
+            line3 = ('body waves:  %s (%.1f s),  ' +\
+                    'surface waves: %s (%.1f s)') %\
+                    (self.passband_bw, self.process_bw.window_length,
+                     self.passband_sw, self.process_sw.window_length)
+
+        elif self.process_sw:
+            line3 = 'passband: %s,  window length: %.1f s ' %\
+                    (self.passband_sw, self.process_sw.window_length)
+
+        # text line #4
+        line4 = _focal_mechanism(self.lune_dict)
+        line4 +=  ',   '+_gamma_delta(self.lune_dict)
+
+        if self.N_total and self.N_p_used and self.N_s_used:
+            line4 += ',   N-Np-Ns : %d-%d-%d' % (self.N_total, self.N_p_used, self.N_s_used)
+        elif self.N_s_used:
+            line4 += ',   N : %d' % self.N_s_used
+
+        return [line1, line2, line3, line4]
 
 
-    def write(self, height, width, margin_left, margin_top):
-        """ Writes header text to current figure
+    def write(self, height, width, margin_left, margin_top, fig=None):
+        """ Writes header text to given figure (defaults to current figure)
         """
-        ax = self._get_axis(height)
+        ax = self._get_axis(height, fig=fig)
 
         self.display_source(ax, height, width, margin_left)
 
@@ -257,51 +281,22 @@ class MomentTensorHeader(SourceHeader):
         # write text line #1
         px += 0.00
         py -= 0.35
-
-        line = '%s  %s  $M_w$ %.2f  Depth %s' % (
-            self.event_name, _lat_lon(self.origin), self.magnitude, self.depth_str)
-        _write_bold(line, px, py, ax, fontsize=16.5)
-
+        _write_bold(self.lines[0], px, py, ax, fontsize=16.5)
 
         # write text line #2
         px += 0.00
         py -= 0.30
-
-        line = u'model: %s   solver: %s   misfit (%s): %.3e' % \
-                (self.model, self.solver, self.norm, self.best_misfit)
-        _write_text(line, px, py, ax, fontsize=14)
-
+        _write_text(self.lines[1], px, py, ax, fontsize=14)
 
         # write text line #3
         px += 0.00
         py -= 0.30
-
-        if self.process_bw and self.process_bw:
-            line = ('body waves:  %s (%.1f s),  ' +\
-                    'surface waves: %s (%.1f s)') %\
-                    (self.passband_bw, self.process_bw.window_length,
-                     self.passband_sw, self.process_sw.window_length)
-
-        elif self.process_sw:
-            line = 'passband: %s,  window length: %.1f s ' %\
-                    (self.passband_sw, self.process_sw.window_length)
-
-        _write_text(line, px, py, ax, fontsize=14)
-
+        _write_text(self.lines[2], px, py, ax, fontsize=14)
 
         # write text line #4
         px += 0.00
         py -= 0.30
-
-        line = _focal_mechanism(self.lune_dict)
-        line +=  ',   '+_gamma_delta(self.lune_dict)
-
-        if self.N_total and self.N_p_used and self.N_s_used:
-            line += ',   N-Np-Ns : %d-%d-%d' % (self.N_total, self.N_p_used, self.N_s_used)
-        elif self.N_s_used:
-            line += ',   N : %d' % self.N_s_used
-
-        _write_text(line, px, py, ax, fontsize=14)
+        _write_text(self.lines[3], px, py, ax, fontsize=14)
 
 
 
@@ -346,65 +341,72 @@ class ForceHeader(SourceHeader):
         self.parse_data_processing()
         self.parse_station_counts()
 
+        # header text doesn't depend on figure, so it's only constructed once
+        self.lines = self._build_lines()
 
-    def write(self, height, width, margin_left, margin_top):
 
-        ax = self._get_axis(height)
+    def _build_lines(self):
+        """ Returns header text as a list of four lines
+        """
+        # text line #1
+        line1 = '%s  %s  $F$ %.2e N   Depth %s' % (
+            self.event_name, _lat_lon(self.origin), self.force_dict['F0'], self.depth_str)
+
+        # text line #2
+        line2 = u'model: %s   solver: %s   misfit (%s): %.3e' % \
+                (self.model, self.solver, self.norm, self.best_misfit)
+
+        # text line #3
+        if self.process_bw and self.process_sw:
+            line3 = ('body waves:  %s (%.1f s),  ' +\
+                    'surface waves: %s (%.1f s) ') %\
+                    (self.passband_bw, self.process_bw.window_length,
+                     self.passband_sw, self.process_sw.window_length)
+
+        elif self.process_sw:
+            line3 = 'passband: %s,  window length: %.1f s ' %\
+                    (self.passband_sw, self.process_sw.window_length)
+
+        # text line #4
+        line4 = _phi_theta(self.force_dict)
+
+        if self.N_total and self.N_p_used and self.N_s_used:
+            line4 += ',   N-Np-Ns : %d-%d-%d' % (self.N_total, self.N_p_used, self.N_s_used)
+        elif self.N_total:
+            line4 += ',   N : %d' % self.N_total
+
+        return [line1, line2, line3, line4]
 
-        self.display_source(ax, height, width, margin_left)
 
+    def write(self, height, width, margin_left, margin_top, fig=None):
+        """ Writes header text to given figure (defaults to current figure)
+        """
+        ax = self._get_axis(height, fig=fig)
+
+        self.display_source(ax, height, width, margin_left)
 
         px = 2.*margin_left + 0.75*height
         py = height - margin_top
 
-
         # write text line #1
         px += 0.00
         py -= 0.35
-
-        line = '%s  %s  $F$ %.2e N   Depth %s' % (
-            self.event_name, _lat_lon(self.origin), self.force_dict['F0'], self.depth_str)
-        _write_bold(line, px, py, ax, fontsize=16)
-
+        _write_bold(self.lines[0], px, py, ax, fontsize=16)
 
         # write text line #2
         px += 0.00
         py -= 0.30
-
-        line = u'model: %s   solver: %s   misfit (%s): %.3e' % \
-                (self.model, self.solver, self.norm, self.best_misfit)
-        _write_text(line, px, py, ax, fontsize=14)
-
+        _write_text(self.lines[1], px, py, ax, fontsize=14)
 
         # write text line #3
         px += 0.00
         py -= 0.30
-
-        if self.process_bw and self.process_bw:
-            line = ('body waves:  %s (%.1f s),  ' +\
-                    'surface waves: %s (%.1f s) ') %\
-                    (self.passband_bw, self.process_bw.window_length,
-                     self.passband_sw, self.process_sw.window_length)
-
-        elif self.process_sw:
-            line = 'passband: %s,  window length: %.1f s ' %\
-                    (self.passband_sw, self.process_sw.window_length)
-
-        _write_text(line, px, py, ax, fontsize=14)
-
+        _write_text(self.lines[2], px, py, ax, fontsize=14)
 
         # write text line #4
         px += 0.00
         py -= 0.30
-
-        line = _phi_theta(self.force_dict)
-
-        if self.N_total and self.N_p_used and self.N_s_used:
-            line += ',   N-Np-Ns : %d-%d-%d' % (self.N_total, self.N_p_used, self.N_s_used)
-        elif self.N_total:
-            line += ',   N : %d' % self.N_total
-
-        _write_text(line, px, py, ax, fontsize=14)
+        _write_text(self.lines[3], px, py, ax, fontsize=14)
 
 
     def display_source(self, ax, height, width, offset):
@@ -432,6 +434,35 @@ class ForceHeader(SourceHeader):
 
 
 
+@lru_cache(maxsize=128)
+def _render_beachball(mt_tuple):
+    # the same moment tensor is often displayed in many figures, so rendered
+    # images are cached (keyed on rounded moment tensor components)
+    img = plot_beachball(None, MomentTensor(mt_tuple), None, None)
+    if img is not None:
+        img.flags.writeable = False
+    return img
+
+
+# the same data processing objects are often shared by many headers, so
+# passband strings are computed only once per object
+_passband_cache = WeakKeyDictionary()
+
+def _passband(process):
+    try:
+        return _passband_cache[process]
+    except KeyError:
+        pass
+
+    passband = {
+        'Hz': '%.1f - %.1f Hz' % (process.freq_min, process.freq_max),
+        's': '%.1f - %.1f s' % (process.freq_max**-1, process.freq_min**-1),
+        }
+
+    _passband_cache[process] = passband
+    return passband
+
+
 def _lat_lon(origin):
     if origin.latitude >= 0:
         latlon = '%.2f%s%s' % (+origin.latitude, u'\N{DEGREE SIGN}', 'N')
@@ -449,9 +480,9 @@ def _lat_lon(origin):
 def _focal_mechanism(lune_dict):
     strike = lune_dict['kappa']
 
-    try:
-        dip = np.degrees(np.arccos(lune_dict['h']))
-    except:
+    if 'h' in lune_dict:
+        dip = degrees(acos(lune_dict['h']))
+    else:
         dip = lune_dict['theta']
 
     slip = lune_dict['sigma']
@@ -461,10 +492,9 @@ def _focal_mechanism(lune_dict):
 
 
 def _gamma_delta(lune_dict):
-    try:
-        v, w = lune_dict['v'], lune_dict['w']
-        delta, gamma = to_delta_gamma(v, w)
-    except:
+    if 'v' in lune_dict and 'w' in lune_dict:
+        delta, gamma = to_delta_gamma(lune_dict['v'], lune_dict['w'])
+    else:
         delta, gamma = lune_dict['delta'], lune_dict['gamma']
 
     return 'lune coords %s  %s:  %.f  %.f' % (u'\u03B3', u'\u03B4', gamma, delta)
@@ -472,28 +502,39 @@ def _gamma_delta(lune_dict):
 
 
 def _phi_theta(force_dict):
-    try:
-        phi, theta = force_dict['phi'], force_dict['theta']
-    except:
-        phi, h = force_dict['phi'], force_dict['h']
-        theta = np.degrees(np.arccos(h))
+    phi = force_dict['phi']
+
+    if 'theta' in force_dict:
+        theta = force_dict['theta']
+    else:
+        theta = degrees(acos(force_dict['h']))
 
     return '%s  %s:  %.f  %.f' % (u'\u03C6', u'\u03B8', phi, theta)
 
 
 def _write_text(text, x, y, ax, fontsize=12, **kwargs):
-    pyplot.text(x, y, text, fontsize=fontsize, **kwargs)
+    ax.text(x, y, text, fontsize=fontsize, **kwargs)
 
 
-def _write_bold(text, x, y, ax, fontsize=14):
+@lru_cache(maxsize=None)
+def _get_font(style='normal', weight='normal'):
+    # font lookups are relatively expensive, so font properties are created
+    # only once (on first use rather than at import time, so that the default
+    # font family set by mtuq.graphics is picked up)
     font = FontProperties()
-    #font.set_weight('bold')
-    pyplot.text(x, y, text, fontproperties=font, fontsize=fontsize)
+    font.set_style(style)
+    font.set_weight(weight)
+    return font
+
+
+def _write_bold(text, x, y, ax, fontsize=14):
+    #font = _get_font(weight='bold')
+    font = _get_font()
+    ax.text(x, y, text, fontproperties=font, fontsize=fontsize)
 
 
 def _write_italic(text, x, y, ax, fontsize=12):
-    font = FontProperties()
-    font.set_style('italic')
-    pyplot.text(x, y, text, fontproperties=font, fontsize=fontsize)
+    font = _get_font(style='italic')
+    ax.text(x, y, text, fontproperties=font, fontsize=fontsize)
 
 
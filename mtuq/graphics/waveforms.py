@@ -391,7 +391,7 @@ def _initialize(nrows=None, ncolumns=None, column_width_ratios=None,
     if header:
         header.write(
             header_height, width,
-            margin_left, margin_top)
+            margin_left, margin_top, fig=fig)
 
     # single station plotting workaround
     if nrows==1:
@@ -3,6 +3,7 @@ import numpy as np
 import warnings
 
 from copy import copy, deepcopy
+from functools import wraps
 from mtuq.event import Origin
 from mtuq.station import Station
 from mtuq.dataset import Dataset
@@ -242,6 +243,17 @@ class GreensTensor(Stream):
 
 
 
+def _invalidates_index(method):
+    """ Wraps list method so that the origin index used by
+    `GreensTensorList.select` is rebuilt after the list is modified
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._origin_index = None
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class GreensTensorList(list):
     """ Container for one or more `GreensTensor` objects
     """
@@ -266,19 +278,50 @@ class GreensTensorList(list):
         elif not hasattr(tensor, 'origin'):
             raise Exception("GreensTensor lacks origin metadata")
 
+        self._origin_index = None
         super(GreensTensorList, self).append(tensor)
 
 
+    # other methods that modify the list in place
+    extend = _invalidates_index(list.extend)
+    insert = _invalidates_index(list.insert)
+    remove = _invalidates_index(list.remove)
+    pop = _invalidates_index(list.pop)
+    clear = _invalidates_index(list.clear)
+    sort = _invalidates_index(list.sort)
+    reverse = _invalidates_index(list.reverse)
+    __setitem__ = _invalidates_index(list.__setitem__)
+    __delitem__ = _invalidates_index(list.__delitem__)
+    __iadd__ = _invalidates_index(list.__iadd__)
+    __imul__ = _invalidates_index(list.__imul__)
+
+
     def select(self, selector):
         """ Selects `GreensTensors` that match the given station or origin
+
+        Tensors are grouped by origin location the first time an origin is
+        selected. Origins of tensors already in the list should not be
+        modified afterwards; a tensor whose origin is moved to a new location
+        may be missed when that location is selected
         """
         if type(selector) is Station:
             selected = self.__class__(id=self.id, tensors=filter(
                 lambda tensor: tensor.station==selector, self))
 
         elif type(selector) is Origin:
+            # only tensors at the same location need to be compared, so that
+            # selecting many origins in turn requires only a single pass
+            # over the list
+            key = _origin_key(selector)
+            candidates = self._get_origin_index().get(key, [])
+
+            if any(_origin_key(tensor.origin) != key for tensor in candidates):
+                # an origin was modified after indexing
+                self._origin_index = None
+                candidates = self._get_origin_index().get(key, [])
+
             selected = self.__class__(id=self.id, tensors=filter(
-                lambda tensor: tensor.origin==selector, self))
+                lambda tensor: tensor.origin==selector, candidates))
 
         else:
             raise TypeError("Bad selector: %s" % type(selector).__name__)
@@ -291,6 +334,19 @@ class GreensTensorList(list):
         return selected
 
 
+    def _get_origin_index(self):
+        """ Returns dictionary that groups tensors by origin location
+        (built on first use and rebuilt whenever the list is modified)
+        """
+        if getattr(self, '_origin_index', None) is None:
+            index = {}
+            for tensor in self:
+                index.setdefault(_origin_key(tensor.origin), []).append(tensor)
+            self._origin_index = index
+
+        return self._origin_index
+
+
     def get_synthetics(self, source, components=None, stats=None, mode='apply', **kwargs):
         """ Generates synthetics through a linear combination of time series
 
@@ -511,3 +567,12 @@ class GreensTensorList(list):
            pickle.dump(self, file)
 
 
+def _origin_key(origin):
+    # origin time is left out, since UTCDateTime comparisons are made only up
+    # to a given precision
+    return (
+        origin.latitude,
+        origin.longitude,
+        origin.depth_in_m,
+        )
+
@@ -6,10 +6,12 @@ import pandas
 import xarray
 
 from collections.abc import Iterable
+from multiprocessing import Pool
 from mtuq.event import Origin
 from mtuq.grid import DataFrame, DataArray, Grid, UnstructuredGrid
-from mtuq.util import gather2, iterable, timer, remove_list, warn,\
-    ProgressCallback, dataarray_idxmin, dataarray_idxmax
+from mtuq.misfit.waveform import WaveformMisfit
+from mtuq.util import scatter2, iterable, timer, remove_list, warn,\
+    Null, ProgressCallback, dataarray_idxmin, dataarray_idxmax
 from os.path import splitext
 from xarray.core.formatting import unindexed_dims_repr
 
@@ -18,7 +20,8 @@ xarray.set_options(keep_attrs=True)
 
 
 def grid_search(data, greens, misfit, origins, sources, 
-    msg_interval=25, timed=True, verbose=1, gather=True):
+    msg_interval=25, timed=True, verbose=1, gather=True, processes=None,
+    parallel=False):
 
     """ Evaluates misfit over grids
 
@@ -27,6 +30,10 @@ def grid_search(data, greens, misfit, origins, sources,
     Carries out a grid search by evaluating 
     `misfit(data, greens.select(origin), source)` over all origins and sources.
 
+    If the misfit function has an `evaluate_batched` method, then
+    `misfit.evaluate_batched(data, greens_list, sources)` is called instead,
+    with Green's functions for all origins given at once.
+
     If `origins` and `sources` are regularly-spaced, returns an `MTUQDataArray`
     containing misfit values and corresponding grid points. Otherwise, 
     an `MTUQDataFrame` is returned.
@@ -69,23 +76,55 @@ def grid_search(data, greens, misfit, origins, sources,
     (ignored outside MPI environment)
 
 
+    ``processes`` (`int`):
+    If greater than 1, origins are divided among this many worker processes
+    using `multiprocessing`
+    (cannot be combined with MPI or with `parallel`)
+
+
+    ``parallel`` (`bool`):
+    If `True` and Numba is installed, `WaveformMisfit` evaluation is divided
+    among threads (see ``mtuq.misfit.waveform.numba_L2``). Otherwise, the
+    C extension is used
+    (ignored inside MPI environment; cannot be combined with `processes`)
+
+
     .. note:
 
       If invoked from an MPI environment, the grid is partitioned between
       processes and each process runs ``_grid_search_serial`` on its given
       partition. If not invoked from an MPI environment, `grid_search`
-      reduces to ``_grid_search_serial``.
+      reduces to ``_grid_search_serial``, or to ``_grid_search_pool`` if
+      `processes` is greater than 1.
 
     """
 
     # check input arguments
-    origins = iterable(origins)
+    if not isinstance(origins, (list, tuple)):
+        # origins are normalized here once, so that downstream functions can
+        # rely on a sized sequence
+        origins = list(iterable(origins))
+
     for origin in origins:
         assert type(origin) is Origin
 
     if type(sources) not in (Grid, UnstructuredGrid):
         raise TypeError
 
+    # keyword arguments passed to misfit function
+    misfit_kwargs = {}
+    if parallel and isinstance(misfit, WaveformMisfit) and not _is_mpi_env():
+        misfit_kwargs['parallel'] = True
+
+    if parallel and processes is not None and processes > 1:
+        raise Exception('Multithreading cannot be combined with '
+            'multiprocessing. Please choose either parallel=True or '
+            'processes>1.')
+
+    if _is_mpi_env() and processes is not None:
+        raise Exception('Multiprocessing cannot be combined with MPI. '
+            'Please leave processes=None when running under MPI.')
+
     if _is_mpi_env():
         from mpi4py import MPI
         comm = MPI.COMM_WORLD
@@ -114,10 +153,15 @@ def grid_search(data, greens, misfit, origins, sources,
         # divide up the grid search over MPI processes
         #
         _all = sources
-        _subsets = None
-        if iproc == 0:
-            _subsets = sources.partition(nproc)
-        sources = comm.scatter(_subsets, root=0)
+        if type(sources) is UnstructuredGrid:
+            # unstructured grids are backed by coordinate arrays, which can be
+            # sent in bulk rather than pickled
+            sources = _scatter_unstructured(comm, sources)
+        else:
+            _subsets = None
+            if iproc == 0:
+                _subsets = sources.partition(nproc)
+            sources = comm.scatter(_subsets, root=0)
 
         if iproc != 0:
             timed = False
@@ -127,17 +171,26 @@ def grid_search(data, greens, misfit, origins, sources,
     #
     # evaluate misfit over grids
     #
-    values = _grid_search_serial(
-        data, greens, misfit, origins, sources, timed=timed,
-        msg_interval=msg_interval)
+    if _is_mpi_env() and gather:
+        # results are gathered on process 0 while misfit evaluation is still
+        # in progress
+        values = _grid_search_serial(
+            data, greens, misfit, origins, sources, timed=timed,
+            msg_interval=msg_interval, comm=comm)
+    elif processes is not None and processes > 1:
+        values = _grid_search_pool(
+            data, greens, misfit, origins, sources, processes, timed=timed,
+            misfit_kwargs=misfit_kwargs)
+    else:
+        values = _grid_search_serial(
+            data, greens, misfit, origins, sources, timed=timed,
+            msg_interval=msg_interval, misfit_kwargs=misfit_kwargs)
 
 
     #
     # collect results
     #
     if _is_mpi_env() and gather:
-        # gather results from MPI processes
-        values = gather2(comm, values)
         sources = _all
 
         if iproc!=0:
@@ -154,25 +207,160 @@ def grid_search(data, greens, misfit, origins, sources,
 
 @timer
 def _grid_search_serial(data, greens, misfit, origins, sources, 
-    timed=True, msg_interval=25):
+    timed=True, msg_interval=25, comm=None, misfit_kwargs=None):
     """ Evaluates misfit over origin and source grids 
     (serial implementation)
+
+    If an MPI communicator is given, the results for each origin are sent to
+    process 0 by a nonblocking gather, so that communication overlaps with
+    misfit evaluation for the next origin. Process 0 then returns results from
+    all processes and other processes return `None`.
+
+    Expects `origins` to be a list or other sized sequence, as given by
+    `grid_search`.
     """
     ni = len(origins)
     nj = len(sources)
 
-    values = []
+    if misfit_kwargs is None:
+        misfit_kwargs = {}
+
+    if comm is not None:
+        gatherer = _Gatherer(comm, ni, nj)
+
+    # Green's functions corresponding to each origin
+    greens_by_origin = [greens.select(origin) for origin in origins]
+
+    # NumPy array of shape `(len(origins), len(sources))`, so that results
+    # for each origin are contiguous
+    values = np.empty((ni, nj))
+
+    if hasattr(misfit, 'evaluate_batched'):
+        # some misfit functions can evaluate all origins in a single
+        # vectorized call
+        values[:, :] = misfit.evaluate_batched(
+            data, greens_by_origin, sources).T
+
+        if comm is not None:
+            for _i in range(ni):
+                gatherer.post(_i, values[_i])
+
+            return gatherer.wait()
+
+        return values
+
+    msg_handle = ProgressCallback(
+        start=0, stop=ni*nj, percent=msg_interval)
+
     for _i, origin in enumerate(origins):
 
-        msg_handle = ProgressCallback(
-            start=_i*nj, stop=ni*nj, percent=msg_interval)
+        msg_handle.set_start(_i*nj)
 
         # evaluate misfit function
-        values += [misfit(
-            data, greens.select(origin), sources, msg_handle)]
+        values[_i] = np.reshape(misfit(
+            data, greens_by_origin[_i], sources, msg_handle,
+            **misfit_kwargs), -1)
+
+        if comm is not None:
+            gatherer.post(_i, values[_i])
+
+    if comm is not None:
+        return gatherer.wait()
+
+    return values
+
+
+@timer
+def _grid_search_pool(data, greens, misfit, origins, sources, processes,
+    timed=True, misfit_kwargs=None):
+    """ Evaluates misfit over origin and source grids 
+    (multiprocessing implementation)
+
+    Origins are divided among worker processes. Inputs are passed to each
+    worker once, through the pool initializer, rather than with every task
+    """
+    if misfit_kwargs is None:
+        misfit_kwargs = {}
+
+    # Green's functions corresponding to each origin
+    greens_by_origin = [greens.select(origin) for origin in origins]
+
+    with Pool(processes, initializer=_init_worker, initargs=(
+        data, greens_by_origin, misfit, sources, misfit_kwargs)) as pool:
+        rows = pool.map(_eval_one_origin, range(len(origins)))
+
+    # NumPy array of shape `(len(origins), len(sources))` 
+    return np.stack(rows)
+
+
+_worker_args = None
 
-    # returns NumPy array of shape `(len(sources), len(origins))` 
-    return np.concatenate(values, axis=1)
+def _init_worker(*args):
+    """ Stores grid search inputs in the worker process
+    """
+    global _worker_args
+    _worker_args = args
+
+
+def _eval_one_origin(_i):
+    """ Evaluates misfit for the `_i`-th origin (multiprocessing worker)
+    """
+    data, greens_by_origin, misfit, sources, misfit_kwargs = _worker_args
+    return np.reshape(
+        misfit(data, greens_by_origin[_i], sources, Null(), **misfit_kwargs),
+        -1)
+
+
+class _Gatherer(object):
+    """ Gathers grid search results on process 0 one origin at a time, using 
+    nonblocking `Igatherv` calls
+    """
+    def __init__(self, comm, ni, nj):
+        from mpi4py import MPI
+
+        self.comm = comm
+        self.requests = []
+        self.sendbufs = []
+
+        sendcounts = comm.gather(nj, root=0)
+
+        if comm.rank == 0:
+            self.sendcounts = np.array(sendcounts)
+            self.displs = np.concatenate(([0], np.cumsum(sendcounts)[:-1]))
+            self.recvbuf = np.empty((ni, sum(sendcounts)))
+        else:
+            self.recvbuf = None
+
+        self.mpi_type = MPI.DOUBLE
+
+
+    def post(self, _i, values):
+        """ Starts gathering results for the `_i`-th origin
+        """
+        sendbuf = np.ascontiguousarray(values, dtype='float64')
+
+        if self.comm.rank == 0:
+            recvbuf = (self.recvbuf[_i], self.sendcounts, self.displs,
+                self.mpi_type)
+        else:
+            recvbuf = None
+
+        self.requests += [self.comm.Igatherv(
+            sendbuf=(sendbuf, self.mpi_type), recvbuf=recvbuf, root=0)]
+
+        # send buffers must stay alive until the requests complete
+        self.sendbufs += [sendbuf]
+
+
+    def wait(self):
+        """ Waits for all gathers to complete
+        """
+        from mpi4py import MPI
+        MPI.Request.Waitall(self.requests)
+
+        if self.comm.rank == 0:
+            # returns NumPy array of shape `(len(origins), len(sources))` 
+            return self.recvbuf
 
 
 
@@ -274,7 +462,18 @@ class MTUQDataFrame(pandas.DataFrame):
 # utility functions
 #
 
+_MPI_ENV = None
+
 def _is_mpi_env():
+    # the answer cannot change during the lifetime of the interpreter, so it
+    # is determined only once
+    global _MPI_ENV
+    if _MPI_ENV is None:
+        _MPI_ENV = _check_mpi_env()
+    return _MPI_ENV
+
+
+def _check_mpi_env():
     try:
         import mpi4py
     except ImportError:
@@ -291,8 +490,30 @@ def _is_mpi_env():
         return False
 
 
+def _scatter_unstructured(comm, grid):
+    """ Partitions UnstructuredGrid among MPI processes using `Scatterv`
+
+    Yields the same subsets as `UnstructuredGrid.partition`
+    """
+    iproc, nproc = comm.rank, comm.size
+
+    array = None
+    if iproc == 0:
+        array = np.stack(grid.coords, axis=1)
+    coords = scatter2(comm, array)
+
+    size = comm.bcast(grid.size, root=0)
+    start = int(iproc*size/nproc)
+    stop = int((iproc+1)*size/nproc)
+
+    return UnstructuredGrid(grid.dims, coords.T, start, stop,
+        callback=grid.callback)
+
+
 def _to_dataarray(origins, sources, values):
     """ Converts grid_search inputs to DataArray
+
+    Expects `values` of shape `(len(origins), len(sources))`
     """
     origin_dims = ('origin_idx',)
     origin_coords = [np.arange(len(origins))]
@@ -303,7 +524,7 @@ def _to_dataarray(origins, sources, values):
     source_shape = sources.shape
 
     return MTUQDataArray(**{
-        'data': np.reshape(values, source_shape + origin_shape),
+        'data': np.reshape(values.T, source_shape + origin_shape),
         'coords': source_coords + origin_coords,
         'dims': source_dims + origin_dims,
          })
@@ -311,6 +532,8 @@ def _to_dataarray(origins, sources, values):
 
 def _to_dataframe(origins, sources, values, index_type=2):
     """ Converts grid_search inputs to DataFrame
+
+    Expects `values` of shape `(len(origins), len(sources))`
     """
     if len(origins)*len(sources) > 1.e7:
         print("  pandas indexing becomes very slow with >10 million rows\n"
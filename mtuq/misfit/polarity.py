@@ -139,6 +139,35 @@ class PolarityMisfit(object):
         return values.reshape(len(values), 1)
 
 
+    def evaluate_batched(self, data, greens_list, sources):
+        """ Evaluates misfit for many origins at once
+
+        Equivalent to calling the misfit function separately for each item of
+        `greens_list`, but predicted polarities for all origins are calculated
+        in a single vectorized call
+
+        Returns a NumPy array of shape `(len(sources), len(greens_list))`
+        """
+        _check(greens_list[0], self.method)
+
+        observed = self.get_observed(data)
+
+        ni, nk = len(greens_list), len(observed)
+        for greens in greens_list:
+            if len(greens) != nk:
+                raise Exception('Inconsistent dimensions')
+
+        # predicted polarities of shape (len(sources), ni, nk)
+        predicted = self.get_predicted(
+            [tensor for greens in greens_list for tensor in greens], sources)
+        predicted = predicted.reshape((len(predicted), ni, nk))
+
+        # mask unpicked
+        mask = (observed != 0).astype(int)
+
+        return np.einsum('ijk,k->ij', np.abs(predicted - observed)/2., mask)
+
+
     def get_observed(self, data):
         """ Extracts observed polarities from data
         """
@@ -162,8 +162,12 @@ class WaveformMisfit(object):
 
 
     def __call__(self, data, greens, sources, progress_handle=Null(), 
-        normalize=None, set_attributes=False, optimization_level=None):
+        normalize=None, set_attributes=False, optimization_level=None,
+        parallel=False):
         """ Evaluates misfit on given data
+
+        With `optimization_level=2`, `parallel=True` divides sources among
+        threads if Numba is installed (ignored otherwise)
         """
         if optimization_level is None:
             optimization_level = self.optimization_level
@@ -207,7 +211,7 @@ class WaveformMisfit(object):
             return level2.misfit(
                 data, greens, sources, self.norm, self.time_shift_groups,
                 self.time_shift_min, self.time_shift_max, progress_handle,
-                normalize=normalize)
+                normalize=normalize, parallel=parallel)
 
 
     def collect_attributes(self, data, greens, source, normalize=False):
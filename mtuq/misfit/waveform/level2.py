@@ -9,6 +9,7 @@ import time
 from copy import deepcopy
 from mtuq.misfit.waveform._stats import _flatten, calculate_norm_data
 from mtuq.misfit.waveform.level1 import correlate
+from mtuq.util import exists_numba
 from mtuq.util.math import to_mij, to_rtp
 from mtuq.util.signal import get_components, get_time_sampling
 from mtuq.misfit.waveform import c_ext_L2
@@ -16,10 +17,14 @@ from mtuq.misfit.waveform import c_ext_L2
 
 def misfit(data, greens, sources, norm, time_shift_groups,
     time_shift_min, time_shift_max, msg_handle, debug_level=0,
-    normalize=False):
+    normalize=False, parallel=False):
     """
     Data misfit function (fast Python/C version)
 
+    If `parallel=True` and Numba is installed, the main computational work is
+    divided among threads by ``numba_L2`` rather than carried out by the 
+    C extension
+
     See ``mtuq/misfit/waveform/__init__.py`` for more information
     """
 
@@ -81,7 +86,13 @@ def misfit(data, greens, sources, norm, time_shift_groups,
 
     start_time = time.time()
 
-    if norm in ['L2', 'hybrid']:
+    if norm in ['L2', 'hybrid'] and parallel and exists_numba():
+        from mtuq.misfit.waveform import numba_L2
+        results = numba_L2.misfit(
+           data_data, greens_data, greens_greens, sources, groups, weights,
+           hybrid_norm, dt, padding[0], padding[1])
+
+    elif norm in ['L2', 'hybrid']:
         results = c_ext_L2.misfit(
            data_data, greens_data, greens_greens, sources, groups, weights,
            hybrid_norm, dt, padding[0], padding[1], debug_level, *msg_args)
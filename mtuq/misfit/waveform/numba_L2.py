@@ -0,0 +1,78 @@
+"""
+Waveform misfit module (multithreaded Numba version)
+
+Reproduces ``c_ext_L2.c``, except that sources are divided among threads and
+no progress messages are displayed.  Used by ``level2`` when available.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def misfit(data_data, greens_data, greens_greens, sources, groups, weights,
+    hybrid_norm, dt, NPAD1, NPAD2):
+
+    NSRC, NG = sources.shape
+    NSTA, NC = weights.shape
+    NGRP = groups.shape[0]
+    NPAD = NPAD1+NPAD2+1
+
+    results = np.empty((NSRC, 1))
+
+    for isrc in prange(NSRC):
+        cc = np.empty(NPAD)
+        L2_sum = 0.
+
+        for ista in range(NSTA):
+            for igrp in range(NGRP):
+
+                # finds the time shift that yields the maximum cross-correlation
+                # value across all components in the given component group
+                cc[:] = 0.
+
+                for ic in range(NC):
+                    if int(groups[igrp, ic])==0:
+                        continue
+                    if abs(weights[ista, ic]) < 1.e-6:
+                        continue
+
+                    for ig in range(NG):
+                        for it in range(NPAD):
+                            cc[it] += greens_data[ista, ic, ig, it] *\
+                                sources[isrc, ig]
+
+                itpad = np.argmax(cc)
+
+                # calculates L2 norm of difference between data and synthetics
+                # using ||s - d||^2 = s^2 + d^2 - 2sd
+                for ic in range(NC):
+                    if int(groups[igrp, ic])==0:
+                        continue
+                    if abs(weights[ista, ic]) < 1.e-6:
+                        continue
+
+                    L2_tmp = 0.
+
+                    # s^2
+                    for j1 in range(NG):
+                        for j2 in range(NG):
+                            L2_tmp += sources[isrc, j1] * sources[isrc, j2] *\
+                                greens_greens[ista, ic, itpad, j1, j2]
+
+                    # d^2
+                    L2_tmp += data_data[ista, ic]
+
+                    # sd
+                    for ig in range(NG):
+                        L2_tmp -= 2.*greens_data[ista, ic, ig, itpad] *\
+                            sources[isrc, ig]
+
+                    if hybrid_norm==0:
+                        L2_sum += dt * weights[ista, ic] * L2_tmp
+                    else:
+                        L2_sum += dt * weights[ista, ic] * L2_tmp**0.5
+
+        results[isrc, 0] = L2_sum
+
+    return results
@@ -2,17 +2,32 @@
 import csv
 import obspy
 import numpy as np
+import threading
 import warnings
 
 from os import listdir
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
+from functools import lru_cache, partial
 from io import TextIOBase
 from obspy import taup
 from obspy.geodetics import gps2dist_azimuth
 from os.path import basename, exists, isdir, join
+from scipy.signal import iirfilter, sosfilt
+from scipy.signal.windows import hann
 from mtuq.util import AttribDict, warn
-from mtuq.util.cap import WeightParser, taper
-from mtuq.util.signal import cut, get_arrival, m_to_deg, _window_warnings
+from mtuq.util.cap import WeightParser, taper, _WEIGHT_KEYS
+from mtuq.util.signal import cut, m_to_deg, _window_warnings
+
+
+# suppress obspy warnings that get raised even when taup is used correctly
+# (someone should submit an ObsPy fix). The filter is installed once, at
+# import, because warnings.catch_warnings is not thread-safe
+warnings.filterwarnings('ignore', module=r'obspy\.taup')
+
+
+# column index of each key in ProcessData weight array
+_WEIGHT_COLUMNS = {key: _i for _i, key in enumerate(_WEIGHT_KEYS)}
 
 
 class ProcessData(object):
@@ -46,18 +61,26 @@ class ProcessData(object):
     See `mtuq/examples/` for further illustration.
 
 
+    .. note::
+
+        To reduce memory traffic, trace data are processed and returned in
+        single precision. Filter coefficients and filter state are kept in
+        double precision, because single-precision recursive filters become
+        inaccurate at low normalized frequencies.
+
+
     .. rubric :: Parameters
 
     ``filter_type`` (`str`)
 
     - ``'bandpass'``
-      Butterworth-Bandpass (uses `obspy.signal.filter.bandpass`)
+      Butterworth-Bandpass (reproduces `obspy.signal.filter.bandpass`)
 
     - ``'lowpass'``
-      Butterworth-Lowpass (uses `obspy.signal.filter.lowpass`)
+      Butterworth-Lowpass (reproduces `obspy.signal.filter.lowpass`)
 
     - ``'highpass'``
-      Butterworth-Highpass (uses `obspy.signal.filter.highpass`)
+      Butterworth-Highpass (reproduces `obspy.signal.filter.highpass`)
 
     - ``None``
       no filter will be applied
@@ -256,6 +279,8 @@ class ProcessData(object):
             self.freq_min = freq_min
             self.freq_max = freq_max
 
+            self._design_sos = partial(_bandpass_sos, freq_min, freq_max)
+
         elif self.filter_type == 'lowpass' or\
                 self.filter_type == 'highpass':
 
@@ -271,9 +296,14 @@ class ProcessData(object):
 
             self.freq = freq
 
+            self._design_sos = partial(_butter_sos, freq, self.filter_type)
+
         else:
             raise ValueError('Bad parameter: filter_type')
 
+        # filter coefficients, computed on demand for each sampling rate
+        self._sos = {}
+
         #
         # check window parameters
         #
@@ -336,6 +366,14 @@ class ProcessData(object):
         self.apply_padding = apply_padding
         self.apply_statics = apply_statics
 
+        # distances and azimuths, computed on demand for each origin and
+        # station location
+        self._distances = {}
+
+        # guards the above and other on-demand caches, so that multiple
+        # threads can share the same instance (see `map_parallel`)
+        self._lock = threading.Lock()
+
         #
         # check phase pick parameters
         #
@@ -348,6 +386,10 @@ class ProcessData(object):
             assert taup_model is not None
             self.taup_model = taup_model
             self._taup = taup.TauPyModel(self.taup_model)
+            self._phase_list = ('p', 's', 'P', 'S')
+
+            # travel times, computed on demand for each depth and distance
+            self._taup_picks = {}
 
         elif self.pick_type == 'FK_metadata':
             assert FK_database is not None
@@ -359,6 +401,9 @@ class ProcessData(object):
             self.FK_database = FK_database
             self.FK_model = FK_model
 
+            # travel times, read on demand from FK metadata
+            self._FK_picks = {}
+
         elif self.pick_type == 'CPS_metadata':
             assert CPS_database is not None
             assert exists(CPS_database)
@@ -420,6 +465,11 @@ class ProcessData(object):
         if self.apply_weights:
             self.weights = parser.parse_weights()
 
+            # for fast lookup, weights are also stored as an array with one
+            # row per station and one column per key in _WEIGHT_KEYS
+            codes, self._weight_array = parser.parse_weights_array()
+            self._weight_rows = {_id: _i for _i, _id in enumerate(codes)}
+
         if self.pick_type == 'user_supplied':
             self.picks = parser.parse_picks()
 
@@ -438,18 +488,14 @@ class ProcessData(object):
         if overwrite:
             traces = traces
         else:
-            traces = deepcopy(traces)
+            traces = _copy_stream(traces)
 
         if not hasattr(traces, 'id'):
             raise Exception('Missing station identifier')
         id = traces.id
 
         # collect location information
-        distance_in_m, azimuth, _ = gps2dist_azimuth(
-            origin.latitude,
-            origin.longitude,
-            station.latitude,
-            station.longitude)
+        distance_in_m, azimuth = self._get_distance(origin, station)
 
         # collect time sampling information
         nt, dt = traces[0].stats.npts, traces[0].stats.delta
@@ -462,11 +508,29 @@ class ProcessData(object):
             raise Exception('Missing tags attribute')
         tags = traces.tags
 
-        if 'units:m' in tags:
+        # set for membership checks below (tags list itself is still used
+        # for in-place updates)
+        tagset = set(tags)
+
+        # loop invariants
+        is_greens = 'type:greens' in tagset
+
+        if self.window_type == 'body_wave':
+            key_prefix = 'body_wave_'
+        else:
+            key_prefix = 'surface_wave_'
+
+        # converts to single precision (see note above); copied traces have
+        # already been converted by _copy_stream
+        for trace in traces:
+            if trace.data.dtype != np.float32:
+                trace.data = trace.data.astype(np.float32)
+
+        if 'units:m' in tagset:
             # nothing to do
             pass
 
-        elif 'units:cm' in tags:
+        elif 'units:cm' in tagset:
             # convert to meters
             for trace in traces:
                 trace.data *= 1.e-2
@@ -484,72 +548,86 @@ class ProcessData(object):
         # part 1: filter traces
         #
 
-        if self.filter_type == 'bandpass':
-            for trace in traces:
-                trace.detrend('demean')
-                trace.detrend('linear')
-                trace.taper(0.05, type='hann')
-                trace.filter('bandpass', zerophase=False,
-                             freqmin=self.freq_min,
-                             freqmax=self.freq_max)
-
-        elif self.filter_type == 'lowpass':
-            for trace in traces:
-                trace.detrend('demean')
-                trace.detrend('linear')
-                trace.taper(0.05, type='hann')
-                trace.filter('lowpass', zerophase=False,
-                             freq=self.freq)
+        # If all traces have the same length and sampling rate, filtering and
+        # integration are applied to all of them at once, using a single 2-D
+        # array built here
+        array = None
+        if self.filter_type or 'type:velocity' in tagset:
+            sampling_rates = {trace.stats.sampling_rate for trace in traces}
+            if len(sampling_rates)==1:
+                array = _stack(traces)
+
+        if self.filter_type:
+            # equivalent to detrend('demean'), detrend('linear'),
+            # taper(0.05, type='hann') and filter(..., zerophase=False),
+            # but without repeated passes over the data
+            if array is not None:
+                sos = self._get_sos(traces[0].stats.sampling_rate)
+                array = sosfilt(sos, _detrend_taper(array)).astype(np.float32)
 
-        elif self.filter_type == 'highpass':
-            for trace in traces:
-                trace.detrend('demean')
-                trace.detrend('linear')
-                trace.taper(0.05, type='hann')
-                trace.filter('highpass', zerophase=False,
-                             freq=self.freq)
+            else:
+                for trace in traces:
+                    sos = self._get_sos(trace.stats.sampling_rate)
+                    trace.data = sosfilt(
+                        sos, _detrend_taper(trace.data)).astype(np.float32)
 
-        if 'type:velocity' in tags:
+        if 'type:velocity' in tagset:
             # convert to displacement
-            for trace in traces:
-                trace.data = np.cumsum(trace.data)*dt
+            # (integrates in place, since data are already single precision)
+            if array is not None:
+                np.cumsum(array, axis=1, out=array)
+                array *= dt
+            else:
+                for trace in traces:
+                    np.cumsum(trace.data, out=trace.data)
+                    trace.data *= dt
             index = tags.index('type:velocity')
             tags[index] = 'type:displacement'
 
+        if array is not None:
+            _unstack(traces, array)
+
         #
         # part 2a: apply distance scaling
         #
 
         if self.apply_scaling:
+            scale = (distance_in_m/self.scaling_coefficient)**self.scaling_power
+
             for trace in traces:
-                trace.data *=\
-                    (distance_in_m/self.scaling_coefficient)**self.scaling_power
+                trace.data *= scale
 
         #
         # part 2b: apply user-supplied data weights
         #
-        if 'type:greens' in tags:
+        if is_greens:
             pass
 
         elif self.apply_weights:
-            for trace in traces:
-                try:
-                    component = trace.stats.channel[-1].upper()
-
-                    if self.window_type == 'body_wave':
-                        key = 'body_wave_'+component
-                    else:
-                        key = 'surface_wave_'+component
+            row = self._weight_rows.get(id)
 
-                    weight = self.weights[id][key]
+            weights = []
+            for trace in traces:
+                # slicing rather than indexing, so that an empty channel code
+                # gives a missing key rather than an IndexError
+                key = key_prefix+trace.stats.channel[-1:].upper()
 
-                except:
+                if row is None or key not in _WEIGHT_COLUMNS:
                     weight = None
+                else:
+                    weight = float(
+                        self._weight_array[row, _WEIGHT_COLUMNS[key]])
+
+                weights += [weight]
 
+            # traces with zero or missing weights are removed all at once,
+            # rather than one at a time by equality search
+            kept = []
+            for trace, weight in zip(traces, weights):
                 if weight:
                     trace.attrs.weight = weight
-                else:
-                    traces.remove(trace)
+                    kept += [trace]
+            traces.traces = kept
 
         #
         # part 3: determine phase picks
@@ -565,32 +643,13 @@ class ProcessData(object):
             picks = dict()
 
             if self.pick_type == 'taup':
-                with warnings.catch_warnings():
-                    # suppress obspy warning that gets raised even when taup is
-                    # used correctly (someone should submit an ObsPy fix)
-                    warnings.filterwarnings('ignore')
-                    arrivals = self._taup.get_travel_times(
-                        origin.depth_in_m/1000.,
-                        m_to_deg(distance_in_m),
-                        phase_list=['p', 's', 'P', 'S'])
-                try:
-                    picks['P'] = get_arrival(arrivals, 'p')
-                except:
-                    picks['P'] = get_arrival(arrivals, 'P')
-                try:
-                    picks['S'] = get_arrival(arrivals, 's')
-                except:
-                    picks['S'] = get_arrival(arrivals, 'S')
+                picks['P'], picks['S'] = self._get_taup_picks(
+                    origin.depth_in_m/1000., m_to_deg(distance_in_m))
 
             elif self.pick_type == 'FK_metadata':
-                sac_headers = obspy.read('%s/%s_%s/%s.grn.0' %
-                                         (self.FK_database,
-                                          self.FK_model,
-                                          str(int(np.ceil(origin.depth_in_m/1000.))),
-                                             str(int(np.ceil(distance_in_m/1000.)))),
-                                         format='sac')[0].stats.sac
-                picks['P'] = sac_headers.t1
-                picks['S'] = sac_headers.t2
+                picks['P'], picks['S'] = self._get_FK_picks(
+                    str(int(np.ceil(origin.depth_in_m/1000.))),
+                    str(int(np.ceil(distance_in_m/1000.))))
 
             elif self.pick_type == 'CPS_metadata':
                 dep_desired = "{:06.1f}".format(
@@ -642,6 +701,8 @@ class ProcessData(object):
                 picks['P'] = sac_headers.t5
                 picks['S'] = sac_headers.t6
 
+        windows = []
+
         for trace in traces:
 
             #
@@ -733,21 +794,14 @@ class ProcessData(object):
                     component = trace.stats.channel[-1].upper()
 
                 try:
-                    if self.window_type == 'body_wave':
-                        key = 'body_wave_'+component
-
-                    else:
-                        key = 'surface_wave_'+component
-
-                    static = self.statics[id][key]
+                    static = self.statics[id][key_prefix+component]
                     trace.attrs.static_shift = static
 
                 except:
                     print('Error reading static time shift: %s' % id)
                     static = 0.
 
-                if self.window_type is not None and\
-                   'type:greens' in tags:
+                if self.window_type is not None and is_greens:
 
                     trace.stats.starttime += static
 
@@ -758,8 +812,7 @@ class ProcessData(object):
             # using a longer window for Green's functions than for data allows for
             # more accurate time-shift corrections
 
-            if self.apply_padding and\
-               'type:greens' in tags:
+            if self.apply_padding and is_greens:
 
                 starttime += self.time_shift_min
                 endtime += self.time_shift_max
@@ -770,16 +823,291 @@ class ProcessData(object):
                     round(+self.time_shift_max/dt))
 
             #
-            # part 4d: cut and taper trace
+            # part 4d: cut and taper traces
             #
 
-            # cuts trace and adjusts metadata
             if self.window_type is not None:
-                cut(trace, starttime, endtime)
+                windows += [(starttime, endtime)]
 
-            elif self.apply_statics and 'type:greens' in tags:
+            elif self.apply_statics and is_greens:
                 print('Not implemented warning')
 
+        # cuts traces and adjusts metadata
+        if self.window_type is not None:
+            _cut_traces(traces, windows)
+
+        for trace in traces:
             taper(trace.data)
 
         return traces
+
+
+    def map_parallel(self, dataset, n_jobs=None):
+        """ Processes all streams in a `Dataset` or `GreensTensorList`
+        using a pool of threads
+
+        Returns a new container of the same type, like ``dataset.map(self)``.
+        Most of the work is done by NumPy and SciPy, which release the GIL, so
+        streams can be processed concurrently.
+
+        .. note ::
+
+            Travel times, distances and filter coefficients are cached by the
+            `ProcessData` instance as they are encountered. Cache updates are
+            guarded by a lock, so cache misses are handled one thread at a time.
+
+        """
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            processed = list(executor.map(self, dataset))
+
+        return dataset.__class__(
+            processed, id=dataset.id)
+
+
+    def _get_distance(self, origin, station):
+        """ Returns distance and azimuth from origin to station
+        """
+        key = (origin.latitude, origin.longitude,
+               station.latitude, station.longitude)
+
+        with self._lock:
+            if key not in self._distances:
+                distance_in_m, azimuth, _ = gps2dist_azimuth(*key)
+                self._distances[key] = (distance_in_m, azimuth)
+
+            return self._distances[key]
+
+
+    def _get_FK_picks(self, depth_in_km, distance_in_km):
+        """ Returns P, S travel times from FK metadata
+
+        Many stations fall in the same depth and distance bins, so each
+        FK header is read only once (and without reading the waveform itself)
+        """
+        key = (depth_in_km, distance_in_km)
+
+        with self._lock:
+            if key in self._FK_picks:
+                return self._FK_picks[key]
+
+            sac_headers = obspy.read('%s/%s_%s/%s.grn.0' %
+                                     (self.FK_database,
+                                      self.FK_model,
+                                      depth_in_km,
+                                      distance_in_km),
+                                     format='sac', headonly=True)[0].stats.sac
+
+            self._FK_picks[key] = (sac_headers.t1, sac_headers.t2)
+            return self._FK_picks[key]
+
+
+    def _get_taup_picks(self, depth_in_km, distance_in_deg):
+        """ Returns P, S travel times from Tau-P model
+
+        Because ray tracing is expensive, travel times are cached, so that
+        processing Green's functions and data for the same station (or
+        stations at the same distance) requires only one Tau-P calculation
+        """
+        key = (depth_in_km, distance_in_deg)
+
+        with self._lock:
+            if key in self._taup_picks:
+                return self._taup_picks[key]
+
+            arrivals = self._taup.get_travel_times(
+                depth_in_km,
+                distance_in_deg,
+                phase_list=self._phase_list)
+
+            # first arrival time of each phase
+            times = {}
+            for arrival in arrivals:
+                times.setdefault(arrival.name, arrival.time)
+
+            P = times.get('p', times.get('P'))
+            S = times.get('s', times.get('S'))
+
+            if P is None or S is None:
+                raise Exception("Phase not found")
+
+            self._taup_picks[key] = (P, S)
+            return P, S
+
+
+    def _get_sos(self, sampling_rate):
+        """ Returns second-order sections of 4-corner Butterworth filter
+        (same as those used by `obspy.signal.filter.bandpass`, etc.)
+        """
+        with self._lock:
+            if sampling_rate in self._sos:
+                return self._sos[sampling_rate]
+
+            # filter design function is bound once in __init__, according to
+            # filter_type
+            sos = self._design_sos(sampling_rate)
+
+            self._sos[sampling_rate] = sos
+            return sos
+
+
+    def __getstate__(self):
+        # locks cannot be pickled or copied
+        state = self.__dict__.copy()
+        state.pop('_lock', None)
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _bandpass_sos(freq_min, freq_max, sampling_rate):
+    """ Designs bandpass filter in the manner of `obspy.signal.filter.bandpass`
+    """
+    fe = 0.5*sampling_rate
+
+    if freq_max/fe - 1. > -1.e-6:
+        warn("Bandpass corner at or above Nyquist. Applying highpass "
+             "instead.")
+        return _butter_sos(freq_min, 'highpass', sampling_rate)
+
+    return iirfilter(4, [freq_min/fe, freq_max/fe], btype='band',
+        ftype='butter', output='sos')
+
+
+def _butter_sos(freq, btype, sampling_rate):
+    """ Designs lowpass or highpass filter in the manner of 
+    `obspy.signal.filter.lowpass` or `obspy.signal.filter.highpass`
+    """
+    fe = 0.5*sampling_rate
+
+    return iirfilter(4, freq/fe, btype=btype, ftype='butter', output='sos')
+
+
+def _copy_stream(traces):
+    """ Copies stream, including trace data and any other attributes
+    modified during processing
+
+    Unlike `deepcopy`, shares station, origin and other stream and trace
+    attributes that are only read during processing. Trace stats, including
+    any `stats.sac` headers, are still copied by `Stats.copy`. Trace data
+    are converted to single precision in the same pass
+    """
+    new = copy(traces)
+
+    if hasattr(traces, 'tags'):
+        new.tags = copy(traces.tags)
+
+    new.traces = []
+    for trace in traces:
+        new_trace = copy(trace)
+        new_trace.stats = trace.stats.copy()
+        new_trace.data = trace.data.astype(np.float32)
+        if hasattr(trace, 'attrs'):
+            new_trace.attrs = deepcopy(trace.attrs)
+        new.traces += [new_trace]
+
+    return new
+
+
+def _cut_traces(traces, windows):
+    """ Cuts each trace to the corresponding `(starttime, endtime)` window
+
+    Equivalent to calling `cut` on each trace, but if all traces share the 
+    same time sampling and window, sample indices are computed only once
+    """
+    if len(traces)==0:
+        return
+
+    stats = traces[0].stats
+    t1, t2 = windows[0]
+
+    regular = all(
+        window == (t1, t2) and
+        trace.stats.starttime == stats.starttime and
+        trace.stats.delta == stats.delta and
+        trace.stats.npts == stats.npts
+        for trace, window in zip(traces, windows))
+
+    if not regular:
+        for trace, window in zip(traces, windows):
+            cut(trace, *window)
+        return
+
+    t0 = float(stats.starttime)
+    dt = float(stats.delta)
+    it1 = int((t1-t0)/dt)
+    it2 = int((t2-t0)/dt)
+
+    # checks bounds and cuts first trace
+    cut(traces[0], t1, t2)
+
+    for trace in traces.traces[1:]:
+        trace.data = trace.data[it1:it2]
+        trace.stats.starttime = traces[0].stats.starttime
+
+
+def _stack(traces):
+    """ Returns trace data as rows of a single 2-D array, or `None` if
+    lengths or data types differ from trace to trace
+    """
+    if len(traces)==0:
+        return None
+
+    shape, dtype = traces[0].data.shape, traces[0].data.dtype
+    for trace in traces:
+        if trace.data.shape != shape or trace.data.dtype != dtype:
+            return None
+
+    return np.stack([trace.data for trace in traces])
+
+
+def _unstack(traces, array):
+    """ Assigns rows of 2-D array to trace data
+    """
+    for _i, trace in enumerate(traces):
+        trace.data = array[_i]
+
+
+def _detrend_taper(data):
+    """ Removes mean and linear trend and applies 5% Hann taper, returning
+    a new array (same as ObsPy's `detrend` and `taper` trace methods)
+
+    For 2-D arrays, each row is processed independently
+    """
+    data = np.array(data, dtype=np.float32)
+    npts = data.shape[-1]
+
+    data -= data.mean(axis=-1, keepdims=True)
+
+    if npts > 1:
+        # least-squares slope about the midpoint
+        t = np.arange(npts) - 0.5*(npts-1)
+        slope = np.dot(data, t)/np.dot(t, t)
+        data -= np.multiply.outer(slope, t)
+
+    left, right = _hann_taper(npts)
+    data[..., :len(left)] *= left
+    data[..., npts-len(right):] *= right
+
+    return data
+
+
+@lru_cache(maxsize=32)
+def _hann_taper(npts, max_percentage=0.05):
+    """ Returns left and right taper weights in the manner of 
+    `obspy.Trace.taper` (cached, since the same trace lengths occur over
+    and over)
+    """
+    wlen = min(int(max_percentage*npts), int(npts/2))
+
+    if 2*wlen == npts:
+        sides = hann(2*wlen)
+    else:
+        sides = hann(2*wlen+1)
+
+    # cached arrays must not be modified
+    sides.flags.writeable = False
+
+    return sides[:wlen], sides[len(sides)-wlen:]
@@ -87,6 +87,62 @@ def gather2(comm, array):
         return
 
 
+def scatter2(comm, array):
+    """ Scatters 2-D NumPy array from process 0, dividing it evenly along
+    first dimension
+
+    For very large numbers of elements, provides improved performance over
+    `scatter` by using the lower-level function `Scatterv`
+    """
+    from mpi4py import MPI
+
+    if comm.rank == 0:
+        if not isinstance(array, np.ndarray):
+            raise NotImplementedError
+
+        if array.ndim!=2:
+            raise NotImplementedError
+
+        array = np.ascontiguousarray(array)
+        shape, dtype = array.shape, array.dtype
+    else:
+        shape, dtype = None, None
+
+    shape, dtype = comm.bcast((shape, dtype), root=0)
+
+    if dtype=="float32":
+        mpi_type = MPI.FLOAT
+
+    elif dtype=="float64":
+        mpi_type = MPI.DOUBLE
+
+    else:
+        raise NotImplementedError
+
+    nrow, ncol = shape
+    nproc = comm.size
+
+    # same division of rows as used by `Grid.partition`
+    bounds = np.array([int(iproc*nrow/nproc) for iproc in range(nproc+1)])
+    sendcounts = ncol*np.diff(bounds)
+    displs = ncol*bounds[:-1]
+
+    recvbuf = np.empty(
+        (bounds[comm.rank+1]-bounds[comm.rank], ncol), dtype=dtype)
+
+    if comm.rank == 0:
+        sendbuf = (array, sendcounts, displs, mpi_type)
+    else:
+        sendbuf = None
+
+    comm.Scatterv(
+        sendbuf=sendbuf,
+        recvbuf=(recvbuf, mpi_type),
+        root=0)
+
+    return recvbuf
+
+
 def is_mpi_env():
     try:
         import mpi4py
@@ -104,6 +160,14 @@ def is_mpi_env():
         return False
 
 
+def exists_numba():
+    try:
+        import numba
+        return True
+    except ImportError:
+        return False
+
+
 def iterable(obj):
     """ Simple list typecast
     """
@@ -339,6 +403,24 @@ class ProgressCallback(object):
         self.iter += 1
 
 
+    def set_start(self, start):
+        """ Repositions callback at the given iteration, so that a single
+        instance can be reused over successive loops
+        """
+        start = int(round(start))
+        self.iter = start
+
+        if self.next_iter==float("inf"):
+            return
+
+        assert (0 <= start)
+        assert (start <= self.stop)
+
+        self.start = start
+        self.msg_count = int(100./self.percent*start/self.stop)
+        self.next_iter = self.msg_count * self.msg_interval
+
+
 def dataarray_idxmin(da, warnings=True):
     """ idxmin helper function
     """
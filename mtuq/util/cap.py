@@ -23,6 +23,15 @@ from os.path import exists
 # individual stations and components in a moment tensor inversion
 #
 
+# weight columns, in the order they appear in CAP-style weight files
+_WEIGHT_KEYS = (
+    'body_wave_Z',
+    'body_wave_R',
+    'surface_wave_Z',
+    'surface_wave_R',
+    'surface_wave_T',
+    )
+
 class WeightParser(object):
     """ Parses CAPUAF-style text file
 
@@ -36,6 +45,21 @@ class WeightParser(object):
             self._file = open(file, "r")
 
 
+    def _read_rows(self):
+        """ Returns non-comment rows, reading the file only on first call
+        """
+        if not hasattr(self, '_rows'):
+            self._file.seek(0)
+
+            reader = csv.reader(
+                filter(lambda row: row[0]!='#', self._file),
+                delimiter=' ',
+                skipinitialspace=True)
+
+            self._rows = list(reader)
+
+        return self._rows
+
     def _parse_code(self, string):
         return '.'.join(string.split('.')[1:4])
 
@@ -46,52 +70,59 @@ class WeightParser(object):
             polarity = 0
         return polarity
 
+    def _read_weights(self):
+        """ Returns station codes and weights from all rows, parsing the file
+        only on first call
+        """
+        if not hasattr(self, '_weights'):
+            weights = {}
+            for row in self._read_rows():
+                # later rows for the same station take precedence
+                weights[self._parse_code(row[0])] = [
+                    float(row[_i]) for _i in range(2, 7)]
+
+            self._weights = (
+                list(weights.keys()),
+                np.array(list(weights.values()), dtype=float).reshape(
+                    -1, len(_WEIGHT_KEYS)),
+                )
+
+        return self._weights
+
     def parse_weights(self, remove_unused=True):
 
-        self._file.seek(0)
+        codes, array = self.parse_weights_array(remove_unused=remove_unused)
 
         weights = defaultdict(AttribDict)
 
-        reader = csv.reader(
-            filter(lambda row: row[0]!='#', self._file),
-            delimiter=' ',
-            skipinitialspace=True)
+        for _code, _row in zip(codes, array):
+            for key, value in zip(_WEIGHT_KEYS, _row):
+                weights[_code][key] = float(value)
 
-        for row in reader:
-            _code = self._parse_code(row[0])
+        return weights
 
-            weights[_code]['body_wave_Z'] = float(row[2])
-            weights[_code]['body_wave_R'] = float(row[3])
-            weights[_code]['surface_wave_Z'] = float(row[4])
-            weights[_code]['surface_wave_R'] = float(row[5])
-            weights[_code]['surface_wave_T'] = float(row[6])
 
-        if remove_unused:
-            unused = []
-            for _code, _weight in weights.items():
-                if _weight['body_wave_Z']==_weight['body_wave_R']==\
-                   _weight['surface_wave_Z']==_weight['surface_wave_R']==\
-                   _weight['surface_wave_T']==0.:
-                    unused += [_code]
+    def parse_weights_array(self, remove_unused=True):
+        """ Returns station codes and corresponding weights as a 2-D array,
+        with one row per station and one column per key in `_WEIGHT_KEYS`
+        """
+        codes, array = self._read_weights()
 
-            for _code in unused:
-                weights.pop(_code)
+        if remove_unused:
+            used = np.any(array != 0., axis=1)
+            codes = [_code for _code, _used in zip(codes, used) if _used]
+            array = array[used]
+        else:
+            codes, array = list(codes), array.copy()
 
-        return weights
+        return codes, array
 
 
     def parse_picks(self):
 
-        self._file.seek(0)
-
         picks = defaultdict(AttribDict)
 
-        reader = csv.reader(
-            filter(lambda row: row[0]!='#', self._file),
-            delimiter=' ',
-            skipinitialspace=True)
-
-        for row in reader:
+        for row in self._read_rows():
             _code = self._parse_code(row[0])
             picks[_code]['P'] = float(row[7])
             picks[_code]['S'] = float(row[9])
@@ -100,16 +131,9 @@ class WeightParser(object):
 
     def parse_polarity(self, remove_unused=True):
 
-        self._file.seek(0)
-
         polarities = []
 
-        reader = csv.reader(
-            filter(lambda row: row[0]!='#', self._file),
-            delimiter=' ',
-            skipinitialspace=True)
-
-        for row in reader:
+        for row in self._read_rows():
             if not float(row[2]) ==\
             float(row[3]) ==\
             float(row[4]) ==\
@@ -122,16 +146,9 @@ class WeightParser(object):
 
     def parse_statics(self):
 
-        self._file.seek(0)
-
         statics = defaultdict(AttribDict)
 
-        reader = csv.reader(
-            filter(lambda row: row[0]!='#', self._file),
-            delimiter=' ',
-            skipinitialspace=True)
-
-        for row in reader:
+        for row in self._read_rows():
             _code = self._parse_code(row[0])
 
             # CAPUAF does not implement body-wave statics
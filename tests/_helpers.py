@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+""" Factories shared by unit tests
+"""
+
+import numpy as np
+
+from mtuq import Origin, Station
+from mtuq.greens_tensor.base import GreensTensor, GreensTensorList
+from obspy import Trace
+
+
+def get_origin(depth_in_m, time='2000-01-01T00:00:00.000000Z'):
+    return Origin({
+        'time': time,
+        'latitude': 0.,
+        'longitude': 0.,
+        'depth_in_m': depth_in_m,
+        })
+
+
+def get_station(_i, latitude=1., longitude=None):
+    if longitude is None:
+        longitude = float(_i)
+
+    return Station({
+        'network': 'XX',
+        'station': 'S%d' % _i,
+        'location': '',
+        'id': 'XX.S%d.' % _i,
+        'latitude': latitude,
+        'longitude': longitude,
+        })
+
+
+def get_tensor(origin, station):
+    # placeholder time series, for tests that only need metadata
+    return GreensTensor([Trace(np.zeros(10))], station, origin)
+
+
+def get_greens(origins, stations):
+    return GreensTensorList([get_tensor(origin, station)
+        for origin in origins for station in stations])
+
@@ -78,6 +78,12 @@ if __name__=='__main__':
     run_checks = (not args.no_checks)
     run_figures = (not args.no_figures)
 
+    # for batch figure generation, the non-interactive Agg backend avoids GUI
+    # event loop overhead
+    if os.environ.get('MTUQ_HEADLESS'):
+        import matplotlib
+        matplotlib.use('Agg')
+
 
     from mtuq.util.cap import\
         get_synthetics_cap, get_synthetics_mtuq,\
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+
+import tarfile
+import unittest
+import numpy as np
+
+from io import StringIO
+from mtuq.util import fullpath
+from mtuq.util.cap import WeightParser, _WEIGHT_KEYS
+
+
+# weight files included with the examples (read directly from the archives,
+# so that data/examples/unpack.bash need not be run first)
+WEIGHT_FILES = [
+    ('data/examples/20090407201255351.tgz', '20090407201255351/weights.dat'),
+    ('data/examples/20210809074550.tgz', '20210809074550/weights.dat'),
+    ('data/examples/SPECFEM3D_SGT.tgz', 'SPECFEM3D_SGT/weights.dat'),
+    ]
+
+
+def _read_weight_file(archive, member):
+    with tarfile.open(fullpath(archive)) as tar:
+        return tar.extractfile(member).read().decode('utf-8')
+
+
+class TestWeightParser(unittest.TestCase):
+
+    def _compare(self, text, remove_unused):
+        parser = WeightParser(StringIO(text))
+
+        weights = parser.parse_weights(remove_unused=remove_unused)
+        codes, array = parser.parse_weights_array(remove_unused=remove_unused)
+
+        assert codes == list(weights.keys())
+        assert array.shape == (len(codes), len(_WEIGHT_KEYS))
+
+        for _i, _code in enumerate(codes):
+            for _j, key in enumerate(_WEIGHT_KEYS):
+                assert array[_i, _j] == weights[_code][key]
+
+
+    def test_weights_array(self):
+        for archive, member in WEIGHT_FILES:
+            text = _read_weight_file(archive, member)
+            self._compare(text, remove_unused=True)
+            self._compare(text, remove_unused=False)
+
+
+    def test_remove_unused(self):
+        text = (
+            "EVT.NET.STA1.. 10 1 1 0 0 0 0 0 0 0 0 0\n"
+            "# comment\n"
+            "EVT.NET.STA2.. 10 0 0 0 0 0 0 0 0 0 0 0\n"
+            "EVT.NET.STA3.. 10 0 0 0 0 2 0 0 0 0 0 0\n"
+            )
+        parser = WeightParser(StringIO(text))
+
+        codes, array = parser.parse_weights_array()
+        assert codes == ['NET.STA1.', 'NET.STA3.']
+        assert np.array_equal(array,
+            [[1., 1., 0., 0., 0.], [0., 0., 0., 0., 2.]])
+
+        codes, array = parser.parse_weights_array(remove_unused=False)
+        assert codes == ['NET.STA1.', 'NET.STA2.', 'NET.STA3.']
+
+        self._compare(text, remove_unused=True)
+        self._compare(text, remove_unused=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
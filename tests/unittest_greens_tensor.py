@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+
+import unittest
+import warnings
+
+from _helpers import get_origin, get_station, get_tensor
+from mtuq.greens_tensor.base import GreensTensorList
+
+
+class TestGreensTensorList(unittest.TestCase):
+
+    def test_select_origin(self):
+        origins = [get_origin(depth_in_m) for depth_in_m in
+            [1000., 2000., 3000.]]
+
+        # same location as origins[0], but different time
+        origins += [get_origin(1000., time='2000-01-01T00:00:01.000000Z')]
+
+        stations = [get_station(_i) for _i in range(3)]
+
+        greens = GreensTensorList([get_tensor(origin, station)
+            for origin in origins for station in stations])
+
+        for origin in origins:
+            selected = greens.select(origin)
+            expected = [tensor for tensor in greens if tensor.origin==origin]
+
+            assert len(selected) == len(stations)
+            assert all(a is b for a, b in zip(selected, expected))
+
+
+    def test_select_origin_after_modification(self):
+        origin1, origin2 = get_origin(1000.), get_origin(2000.)
+        station = get_station(0)
+
+        greens = GreensTensorList([get_tensor(origin1, station)])
+        assert len(greens.select(origin1)) == 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            assert len(greens.select(origin2)) == 0
+
+        greens.append(get_tensor(origin2, station))
+        assert len(greens.select(origin2)) == 1
+
+        greens.extend([get_tensor(origin2, station)])
+        assert len(greens.select(origin2)) == 2
+
+        greens[0] = get_tensor(origin2, station)
+        assert len(greens.select(origin1)) == 0
+        assert len(greens.select(origin2)) == 3
+
+        del greens[1:]
+        assert len(greens.select(origin2)) == 1
+
+
+    def test_select_origin_after_reassignment(self):
+        origin1, origin2 = get_origin(1000.), get_origin(2000.)
+        station = get_station(0)
+
+        greens = GreensTensorList([get_tensor(origin1, station)])
+        assert len(greens.select(origin1)) == 1
+
+        # the index is stale after reassignment, and should be rebuilt
+        greens[0].origin = origin2
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            assert len(greens.select(origin1)) == 0
+
+        assert len(greens.select(origin2)) == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+
+from _helpers import get_origin, get_station, get_greens
+from mtuq.grid import Grid, UnstructuredGrid
+from mtuq.grid_search import grid_search
+
+
+def _get_greens():
+    origins = [get_origin(depth_in_m) for depth_in_m in
+        [1000., 2000., 3000., 4000., 5000.]]
+
+    stations = [get_station(_i) for _i in range(2)]
+
+    return origins, get_greens(origins, stations)
+
+
+def _misfit(data, greens, sources, msg_handle=None):
+    # simple function of origin depth and source coordinates, so that each
+    # grid point has a distinct value
+    depth_in_km = greens[0].origin.depth_in_m/1000.
+    values = [depth_in_km + np.dot(source, np.arange(1., len(source)+1.))
+        for source in sources]
+    return np.array(values).reshape(len(sources), 1)
+
+
+class TestGridSearch(unittest.TestCase):
+
+    def _compare(self, sources):
+        origins, greens = _get_greens()
+
+        kwargs = dict(verbose=0, timed=False, msg_interval=0)
+
+        serial = grid_search(
+            None, greens, _misfit, origins, sources, **kwargs)
+
+        pool = grid_search(
+            None, greens, _misfit, origins, sources, processes=3, **kwargs)
+
+        return serial, pool
+
+
+    def test_pool_dataarray(self):
+        sources = Grid(dims=('x', 'y'),
+            coords=(np.linspace(0., 1., 7), np.linspace(0., 2., 5)))
+
+        serial, pool = self._compare(sources)
+
+        assert serial.identical(pool)
+
+
+    def test_pool_dataframe(self):
+        rng = np.random.RandomState(0)
+        sources = UnstructuredGrid(dims=('x', 'y'),
+            coords=(rng.rand(23), rng.rand(23)))
+
+        serial, pool = self._compare(sources)
+
+        assert serial.equals(pool)
+
+
+    def test_pool_parallel(self):
+        # Numba threads within pool workers would oversubscribe the CPU
+        origins, greens = _get_greens()
+        sources = Grid(dims=('x', 'y'),
+            coords=(np.linspace(0., 1., 7), np.linspace(0., 2., 5)))
+
+        with self.assertRaises(Exception):
+            grid_search(None, greens, _misfit, origins, sources,
+                processes=3, parallel=True, verbose=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+
+import unittest
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+
+from matplotlib import pyplot
+from mtuq import MomentTensor, Origin
+from mtuq.graphics.beachball import _exists_gmt_backend
+from mtuq.graphics.header import MomentTensorHeader
+from mtuq.process_data import ProcessData
+from mtuq.util import AttribDict
+
+
+def _get_header(body_waves=True):
+    origin = Origin({
+        'time': '2009-04-07T20:12:55.000000Z',
+        'latitude': 61.45,
+        'longitude': -149.74,
+        'depth_in_m': 33000.,
+        })
+
+    process_bw = ProcessData(
+        filter_type='Bandpass', freq_min=0.1, freq_max=0.333,
+        window_type='body_wave', window_length=15.,
+        pick_type='taup', taup_model='ak135', apply_weights=False)
+
+    process_sw = ProcessData(
+        filter_type='Bandpass', freq_min=0.025, freq_max=0.0625,
+        window_type='surface_wave', window_length=150.,
+        pick_type='taup', taup_model='ak135', apply_weights=False)
+
+    if not body_waves:
+        process_bw = None
+
+    misfit = AttribDict(norm='L2')
+    mt = MomentTensor([1., -1., 0., 0.2, 0.3, -0.1])
+    lune_dict = {'kappa': 10., 'sigma': 20., 'h': 0.5, 'v': 0., 'w': 0.}
+
+    return MomentTensorHeader(process_bw, process_sw, misfit, misfit,
+        1., 2., 'ak135', 'FK', mt, lune_dict, origin)
+
+
+def _render(header):
+    fig = pyplot.figure(figsize=(10., 8.))
+    header.write(2., 10., 0.25, 0.25, fig=fig)
+    fig.canvas.draw()
+    image = np.asarray(fig.canvas.buffer_rgba()).copy()
+    pyplot.close(fig)
+    return fig, image
+
+
+class TestHeader(unittest.TestCase):
+
+    def test_write_twice(self):
+        # the same header written to two different figures should produce
+        # identical, nonblank images
+        header = _get_header()
+
+        fig1, image1 = _render(header)
+        fig2, image2 = _render(header)
+
+        assert len(fig1.axes) == len(fig2.axes) == 1
+        assert header._axis.figure is fig2
+
+        assert not np.all(image2 == 255)
+        assert np.array_equal(image1, image2)
+
+
+    def test_passband_line(self):
+        # body-wave passband is shown only if body waves were processed
+        assert _get_header().lines[2].startswith('body waves:')
+        assert _get_header(body_waves=False).lines[2].startswith('passband:')
+
+
+    def test_gmt_backend_check_cached(self):
+        # writing a header should not repeat the GMT backend check
+        header = _get_header()
+        _render(header)
+
+        misses = _exists_gmt_backend.cache_info().misses
+        _render(header)
+        assert _exists_gmt_backend.cache_info().misses == misses
+
+
+if __name__ == '__main__':
+    unittest.main()
+
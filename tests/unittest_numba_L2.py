@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+
+from mtuq.misfit.waveform import c_ext_L2
+from mtuq.misfit.waveform.level2 import _autocorr_1, _autocorr_2, _corr_1_2
+from mtuq.util import exists_numba
+
+
+# array dimensions
+NSTA = 3
+NC = 3
+NG = 6
+NT = 200
+NSRC = 50
+
+DT = 0.1
+PADDING = [10, 15]
+
+
+def _get_inputs(seed=0):
+    rng = np.random.RandomState(seed)
+
+    data = rng.standard_normal((NSTA, NC, NT))
+    greens = rng.standard_normal((NSTA, NC, NG, NT))
+    sources = np.ascontiguousarray(rng.standard_normal((NSRC, NG)))
+
+    # one group for Z,R and one for T, with one component turned off
+    groups = np.array([[1., 1., 0.], [0., 0., 1.]])
+    weights = np.ones((NSTA, NC))
+    weights[1, 2] = 0.
+
+    return (_autocorr_1(data), _corr_1_2(data, greens, PADDING),
+        _autocorr_2(greens, PADDING), sources, groups, weights)
+
+
+@unittest.skipUnless(exists_numba(), "Numba not installed")
+class TestNumbaL2(unittest.TestCase):
+
+    def _compare(self, hybrid_norm):
+        from mtuq.misfit.waveform import numba_L2
+
+        data_data, greens_data, greens_greens, sources, groups, weights =\
+            _get_inputs()
+
+        expected = c_ext_L2.misfit(
+            data_data, greens_data, greens_greens, sources, groups, weights,
+            hybrid_norm, DT, PADDING[0], PADDING[1], 0, 0, 0, 0)
+
+        actual = numba_L2.misfit(
+            data_data, greens_data, greens_greens, sources, groups, weights,
+            hybrid_norm, DT, PADDING[0], PADDING[1])
+
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected, rtol=1.e-12, atol=0.)
+
+
+    def test_L2(self):
+        self._compare(hybrid_norm=0)
+
+
+    def test_hybrid(self):
+        self._compare(hybrid_norm=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+
+from _helpers import get_origin, get_station, get_greens
+from mtuq.grid import DoubleCoupleGridRegular
+from mtuq.misfit import PolarityMisfit
+
+
+def _get_greens():
+    origins = [get_origin(depth_in_m) for depth_in_m in
+        [5000., 10000., 20000., 40000.]]
+
+    stations = [get_station(_i, latitude, longitude) for _i, (latitude,
+        longitude) in enumerate([(1., 1.), (-2., 0.5), (0.5, -3.)])]
+
+    return origins, get_greens(origins, stations)
+
+
+class TestPolarityMisfit(unittest.TestCase):
+
+    def test_evaluate_batched(self):
+        # batched evaluation should match calling the misfit function
+        # separately for each origin
+        origins, greens = _get_greens()
+        sources = DoubleCoupleGridRegular(npts_per_axis=6, magnitudes=[4.5])
+
+        # observed polarities, including an unpicked station
+        data = [1, -1, 0]
+
+        misfit = PolarityMisfit(method='taup', taup_model='ak135')
+
+        greens_list = [greens.select(origin) for origin in origins]
+
+        expected = np.concatenate([misfit(data, greens_list[_i], sources)
+            for _i in range(len(origins))], axis=1)
+
+        actual = misfit.evaluate_batched(data, greens_list, sources)
+
+        assert actual.shape == (len(sources), len(origins))
+        assert np.array_equal(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+
+from io import StringIO
+from mtuq import Dataset, Origin, Station
+from mtuq.greens_tensor.base import GreensTensor, GreensTensorList
+from mtuq.process_data import ProcessData, _cut_traces
+from mtuq.util.cap import taper
+from mtuq.util.signal import cut, get_arrival, m_to_deg
+from obspy import Stream, Trace, UTCDateTime
+from obspy.geodetics import gps2dist_azimuth
+from obspy.taup import TauPyModel
+
+
+ORIGIN = Origin({
+    'id': 'EVT',
+    'time': UTCDateTime('1970-01-01T00:00:00.000000Z'),
+    'latitude': 0.,
+    'longitude': 0.,
+    'depth_in_m': 10000.,
+    })
+
+STATION = Station({
+    'network': 'NET',
+    'station': 'STA',
+    'location': '',
+    'id': 'NET.STA.',
+    'latitude': 0.,
+    'longitude': 0.,
+    })
+
+# station at regional distance, for body- and surface-wave windows
+STATION_REGIONAL = Station({
+    'network': 'NET',
+    'station': 'REG',
+    'location': '',
+    'id': 'NET.REG.',
+    'latitude': 0.,
+    'longitude': 0.5,
+    })
+
+# body_wave_Z, body_wave_R, surface_wave_Z, surface_wave_R, surface_wave_T
+WEIGHTS = "EVT.NET.REG.. 55 1 2 1 0 3 0 0 0 0 0 0\n"
+
+NT = 8001
+DT = 0.01
+T1 = -20.
+
+
+def _get_traces(channels, seed=0):
+    rng = np.random.RandomState(seed)
+    traces = []
+    for channel in channels:
+        trace = Trace(rng.standard_normal(NT).cumsum())
+        trace.stats.delta = DT
+        trace.stats.starttime = ORIGIN.time + T1
+        trace.stats.channel = channel
+        traces += [trace]
+    return traces
+
+
+def _get_greens(seed=0, station=STATION):
+    greens = GreensTensor(
+        _get_traces(['ZSS', 'ZDS', 'ZDD', 'ZEP', 'RSS', 'RDS', 'RDD', 'REP'],
+            seed=seed),
+        station, ORIGIN)
+    greens.tags = ['type:greens', 'units:m']
+    return greens
+
+
+def _get_data(seed=0, station=STATION, tags=['units:m', 'type:velocity']):
+    stream = Stream(_get_traces(['BHZ', 'BHR', 'BHT'], seed=seed))
+    stream.id = station.id
+    stream.station = station
+    stream.origin = ORIGIN
+    stream.tags = list(tags)
+    return stream
+
+
+def _get_process():
+    return ProcessData(
+        filter_type='Bandpass',
+        freq_min=0.1,
+        freq_max=1.,
+        window_type='min_max',
+        window_length=20.,
+        v_min=1.,
+        v_max=1.,
+        apply_scaling=False,
+        apply_weights=False)
+
+
+def _process_reference(traces, process):
+    """ Processes traces one at a time in double precision using ObsPy trace
+    methods, in the manner of the original ProcessData implementation
+    """
+    station, tags = traces.station, traces.tags
+    is_greens = 'type:greens' in tags
+
+    distance_in_m, _, _ = gps2dist_azimuth(
+        ORIGIN.latitude, ORIGIN.longitude, station.latitude, station.longitude)
+
+    arrivals = TauPyModel(process.taup_model).get_travel_times(
+        ORIGIN.depth_in_m/1000., m_to_deg(distance_in_m),
+        phase_list=['p', 's', 'P', 'S'])
+    try:
+        P = get_arrival(arrivals, 'p')
+    except:
+        P = get_arrival(arrivals, 'P')
+    try:
+        S = get_arrival(arrivals, 's')
+    except:
+        S = get_arrival(arrivals, 'S')
+
+    if process.window_type == 'body_wave':
+        starttime = P - 0.4*process.window_length
+        key_prefix = 'body_wave_'
+    else:
+        starttime = S - 0.3*process.window_length
+        key_prefix = 'surface_wave_'
+    starttime += float(ORIGIN.time)
+    endtime = starttime + process.window_length
+
+    processed = []
+    for trace in traces:
+        trace = trace.copy()
+        trace.data = trace.data.astype(np.float64)
+
+        if 'units:cm' in tags:
+            trace.data *= 1.e-2
+
+        trace.detrend('demean')
+        trace.detrend('linear')
+        trace.taper(0.05, type='hann')
+        trace.filter('bandpass', zerophase=False,
+            freqmin=process.freq_min, freqmax=process.freq_max)
+
+        if 'type:velocity' in tags:
+            trace.data = np.cumsum(trace.data)*trace.stats.delta
+
+        trace.data *=\
+            (distance_in_m/process.scaling_coefficient)**process.scaling_power
+
+        weight = None
+        if not is_greens:
+            weight = process.weights[traces.id].get(
+                key_prefix+trace.stats.channel[-1])
+            if not weight:
+                continue
+
+        cut(trace, starttime, endtime)
+        taper(trace.data)
+
+        processed += [(trace, weight)]
+
+    return processed
+
+
+def _get_process_regional(window_type, window_length):
+    return ProcessData(
+        filter_type='Bandpass',
+        freq_min=0.1,
+        freq_max=1.,
+        window_type=window_type,
+        window_length=window_length,
+        pick_type='taup',
+        taup_model='ak135',
+        apply_scaling=True,
+        scaling_power=1.,
+        scaling_coefficient=1.e5,
+        apply_weights=True,
+        capuaf_file=StringIO(WEIGHTS))
+
+
+class TestCutTraces(unittest.TestCase):
+
+    def test_cut_greens_tensor(self):
+        greens = _get_greens()
+        expected = [trace.data[500:2500].copy() for trace in greens]
+
+        t1 = float(ORIGIN.time) + T1 + 500*DT
+        t2 = float(ORIGIN.time) + T1 + 2500*DT
+        _cut_traces(greens, [(t1, t2)]*len(greens))
+
+        assert isinstance(greens, GreensTensor)
+        for trace, data in zip(greens, expected):
+            assert trace.stats.starttime == t1
+            assert np.array_equal(trace.data, data)
+
+
+class TestProcessData(unittest.TestCase):
+
+    def test_process_greens_tensor(self):
+        greens = _get_greens()
+        processed = _get_process()(greens)
+
+        assert isinstance(processed, GreensTensor)
+        assert len(processed) == len(greens)
+        for trace in processed:
+            assert trace.stats.npts == processed[0].stats.npts
+            assert trace.stats.starttime == processed[0].stats.starttime
+
+
+    def _compare_reference(self, traces, process):
+        expected = _process_reference(traces, process)
+        actual = process(traces)
+
+        assert len(actual) == len(expected)
+
+        for trace, (reference, weight) in zip(actual, expected):
+            assert trace.stats.channel == reference.stats.channel
+            assert trace.stats.npts == reference.stats.npts
+            assert trace.stats.starttime == reference.stats.starttime
+            assert getattr(trace.attrs, 'weight', None) == weight
+
+            np.testing.assert_allclose(trace.data, reference.data, rtol=1.e-5,
+                atol=1.e-5*np.abs(reference.data).max())
+
+
+    def test_reference_body_waves(self):
+        process = _get_process_regional('body_wave', 15.)
+        self._compare_reference(
+            _get_data(station=STATION_REGIONAL), process)
+        self._compare_reference(
+            _get_greens(station=STATION_REGIONAL), process)
+
+
+    def test_reference_surface_waves(self):
+        process = _get_process_regional('surface_wave', 30.)
+        self._compare_reference(
+            _get_data(station=STATION_REGIONAL), process)
+        self._compare_reference(
+            _get_greens(station=STATION_REGIONAL), process)
+
+
+    def test_reference_units(self):
+        # centimeters, displacement
+        process = _get_process_regional('body_wave', 15.)
+        self._compare_reference(_get_data(station=STATION_REGIONAL,
+            tags=['units:cm', 'type:displacement']), process)
+
+
+    def _check_map_parallel(self, container):
+        process = _get_process()
+        expected = container.map(_get_process())
+        actual = process.map_parallel(container, n_jobs=4)
+
+        assert type(actual) is type(container)
+        assert actual.id == container.id
+        assert len(actual) == len(expected)
+
+        for stream1, stream2 in zip(actual, expected):
+            assert len(stream1) == len(stream2)
+            for trace1, trace2 in zip(stream1, stream2):
+                assert trace1.stats.starttime == trace2.stats.starttime
+                assert np.array_equal(trace1.data, trace2.data)
+
+
+    def test_map_parallel_dataset(self):
+        self._check_map_parallel(Dataset(
+            [_get_data(seed) for seed in range(8)], id='EVT'))
+
+
+    def test_map_parallel_greens_tensor_list(self):
+        self._check_map_parallel(GreensTensorList(
+            [_get_greens(seed) for seed in range(8)], id='EVT'))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
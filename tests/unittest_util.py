@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+
+import contextlib
+import io
+import sys
+import unittest
+import numpy as np
+
+from unittest import mock
+from mtuq.grid import UnstructuredGrid
+from mtuq.util import ProgressCallback, exists_numba, gather2, scatter2
+
+
+def _exists_mpi4py():
+    try:
+        import mpi4py.MPI
+        return True
+    except ImportError:
+        return False
+
+
+def _run(callback, niter):
+    # calls progress callback repeatedly, returning the printed messages
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for _ in range(niter):
+            callback()
+    return output.getvalue()
+
+
+def _state(callback):
+    return {key: getattr(callback, key) for key in
+        ['start', 'stop', 'percent', 'iter', 'msg_count', 'next_iter']
+        if hasattr(callback, key)}
+
+
+class TestProgressCallback(unittest.TestCase):
+
+    def test_set_start(self):
+        # repositioning a callback should be equivalent to creating a new one
+        stop = 1000
+        for percent in [0., 1., 10., 25., 50.]:
+            callback = ProgressCallback(start=0, stop=stop, percent=percent)
+            _run(callback, 137)
+
+            for start in [0, 250, 333, 999]:
+                callback.set_start(start)
+                expected = ProgressCallback(
+                    start=start, stop=stop, percent=percent)
+
+                assert _state(callback) == _state(expected)
+                assert _run(callback, stop-start) ==\
+                    _run(expected, stop-start)
+
+
+class TestExistsNumba(unittest.TestCase):
+
+    def test_exists_numba_fallback(self):
+        # a None entry in sys.modules makes the import raise ImportError
+        with mock.patch.dict(sys.modules, {'numba': None}):
+            assert exists_numba() is False
+
+
+@unittest.skipUnless(_exists_mpi4py(), "mpi4py not installed")
+class TestScatter(unittest.TestCase):
+
+    def test_scatter_gather(self):
+        # scattering then gathering should return the original array
+        # (run with mpiexec to test more than one process)
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+
+        for dtype in ['float32', 'float64']:
+            for nrow in [comm.size, 17, 100]:
+                array = None
+                if comm.rank == 0:
+                    array = np.arange(nrow*3, dtype=dtype).reshape(nrow, 3)
+
+                subset = scatter2(comm, array)
+
+                assert subset.dtype == dtype
+                assert subset.shape[1] == 3
+
+                gathered = gather2(comm, subset)
+
+                if comm.rank == 0:
+                    assert np.array_equal(gathered, array)
+                else:
+                    assert gathered is None
+
+
+    def test_scatter_uneven(self):
+        # each process should receive, in order, the rows assigned to it by
+        # Grid.partition, even when rows do not divide evenly
+        # (run with mpiexec to test more than one process)
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+
+        for nrow in [comm.size, comm.size+1, 2*comm.size-1, 17]:
+            array = np.arange(nrow*3, dtype='float64').reshape(nrow, 3)
+
+            grid = UnstructuredGrid(dims=('row',), coords=(np.arange(nrow),))
+            partitions = grid.partition(comm.size)
+            rows = partitions[comm.rank].coords[0].astype(int)
+
+            subset = scatter2(comm, array if comm.rank == 0 else None)
+            assert np.array_equal(subset, array[rows])
+
+            sizes = comm.allgather(len(subset))
+            assert sizes == [partition.size for partition in partitions]
+
+
+if __name__ == '__main__':
+    unittest.main()
+